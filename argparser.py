@@ -2,6 +2,7 @@
 
 import argparse
 from datetime import datetime
+from functools import lru_cache
 
 
 def check_number(number: str) -> int:
@@ -30,9 +31,13 @@ def check_date(date_string: str) -> str:
     return date_string
 
 
+@lru_cache(maxsize=1)
 def get_args() -> argparse.Namespace:
     """Collect the input provided from CLI, handle the default values and
-    errors"""
+    errors
+
+    The result is cached, so repeated calls do not rebuild the parser and
+    re-validate sys.argv. Callers should not mutate the returned Namespace."""
 
     parser = argparse.ArgumentParser(
         description="This script prints out a structured list of all flight "
@@ -1,17 +1,75 @@
 """Module for organising flight related classes"""
 
-from dataclasses import asdict, dataclass, field
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import cached_property, lru_cache
+from heapq import nsmallest
 from json import dumps
+from operator import attrgetter
+from textwrap import indent
 from typing import Any, Generator, Optional, Protocol
 
-from csvreader import DATE_TIME_PATTERN
+# orjson serializes several times faster than the stdlib json module, but
+# the script stays fully functional without it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Reference point for the integer timestamps stored on Flight objects.
+# The exact epoch does not matter, only differences and comparisons do.
+_EPOCH = datetime(1970, 1, 1)
+
+
+def epoch_seconds(when: datetime) -> int:
+    """Convert a naive datetime into whole seconds since the module epoch
+
+    Plain datetime subtraction is calendar arithmetic, so unlike
+    datetime.timestamp() this never consults the local timezone."""
+
+    return int((when - _EPOCH).total_seconds())
+
+
+@lru_cache(maxsize=None)
+def parse_datetime(value: str) -> datetime:
+    """Parse an ISO timestamp, remembering the result
+
+    Schedule data repeats the same departure and arrival strings across
+    many rows, so identical timestamps are only ever parsed once."""
+
+    return datetime.fromisoformat(value)
 
 
 @dataclass
 class Flight:
     """Container for flight data CSV rows"""
 
+    # A manual __slots__ keeps instances __dict__-free on Python 3.9,
+    # where dataclass(slots=True) is not available yet; tens of thousands
+    # of flights make the ~100 bytes of per-instance dict add up
+    __slots__ = (
+        "flight_no",
+        "origin",
+        "destination",
+        "departure",
+        "arrival",
+        "base_price",
+        "bag_price",
+        "bags_allowed",
+        "full_price",
+        "_departure_dt",
+        "_arrival_dt",
+        "_departure_ts",
+        "_arrival_ts",
+        "_travel_time",
+        "_dict_cache",
+        "origin_bit",
+        "dest_bit",
+    )
+
     flight_no: str
     origin: str
     destination: str
@@ -26,6 +84,65 @@ class Flight:
         self.bag_price = int(self.bag_price)
         self.bags_allowed = int(self.bags_allowed)
 
+        # Price with the run's bag count baked in; starts at the bagless
+        # price and FlightGraph.create_graph re-specializes it once the
+        # requested bag count is known
+        self.full_price: float = self.base_price
+
+        # The same few airport codes and flight numbers repeat across the
+        # whole CSV; interning deduplicates the strings and makes dict and
+        # comparison operations hit the identity fast path
+        self.flight_no = sys.intern(self.flight_no)
+        self.origin = sys.intern(self.origin)
+        self.destination = sys.intern(self.destination)
+
+        # Parse the date time strings only once, the DFS and the layover
+        # checks ask for these values many times for the same flight.
+        # The parse cache also deduplicates identical strings across rows.
+        self._departure_dt: datetime = parse_datetime(self.departure)
+        self._arrival_dt: datetime = parse_datetime(self.arrival)
+        self._travel_time: timedelta = self._arrival_dt - self._departure_dt
+
+        # Integer epoch seconds for the DFS hot path: layover checks and
+        # binary searches become plain int comparisons instead of
+        # allocating timedelta objects
+        self._departure_ts: int = epoch_seconds(self._departure_dt)
+        self._arrival_ts: int = epoch_seconds(self._arrival_dt)
+        self._dict_cache: Optional[dict[str, Any]] = None
+
+        # Single-bit airport masks for visited tracking, assigned by
+        # FlightGraph.create_graph
+        self.origin_bit: int = 0
+        self.dest_bit: int = 0
+
+    @classmethod
+    def from_row(cls, row: list[str]) -> "Flight":
+        """Build a Flight straight from a CSV row (cells in CSV_FIELDS
+        order), skipping the dataclass __init__/__post_init__ machinery on
+        the per-row ingest hot path
+
+        Mirrors __post_init__, keep the two in sync."""
+
+        self = object.__new__(cls)
+        self.flight_no = sys.intern(row[0])
+        self.origin = sys.intern(row[1])
+        self.destination = sys.intern(row[2])
+        self.departure = row[3]
+        self.arrival = row[4]
+        self.base_price = float(row[5])
+        self.bag_price = int(row[6])
+        self.bags_allowed = int(row[7])
+        self.full_price = self.base_price
+        self._departure_dt = parse_datetime(row[3])
+        self._arrival_dt = parse_datetime(row[4])
+        self._travel_time = self._arrival_dt - self._departure_dt
+        self._departure_ts = epoch_seconds(self._departure_dt)
+        self._arrival_ts = epoch_seconds(self._arrival_dt)
+        self._dict_cache = None
+        self.origin_bit = 0
+        self.dest_bit = 0
+        return self
+
     def get_full_price(self, bags_count: int) -> float:
         """Calculate the total price based on the bag number and base price"""
 
@@ -34,17 +151,42 @@ class Flight:
     def get_travel_time(self) -> timedelta:
         """Calculate the total travel time of a flight"""
 
-        return self.get_arrival_time() - self.get_departure_time()
+        return self._travel_time
 
     def get_arrival_time(self) -> datetime:
-        """Convert date time string to datetime object"""
+        """Return the arrival time parsed in __post_init__"""
 
-        return datetime.strptime(self.arrival, DATE_TIME_PATTERN)
+        return self._arrival_dt
 
     def get_departure_time(self) -> datetime:
-        """Convert date time string to datetime object"""
+        """Return the departure time parsed in __post_init__"""
+
+        return self._departure_dt
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the CSV fields as a plain dict, a lot cheaper than the
+        recursive dataclasses.asdict
+
+        The dict is built only once; the same Flight object is shared by
+        every trip that contains it, so later calls return the cache."""
 
-        return datetime.strptime(self.departure, DATE_TIME_PATTERN)
+        if self._dict_cache is None:
+            self._dict_cache = {
+                "flight_no": self.flight_no,
+                "origin": self.origin,
+                "destination": self.destination,
+                "departure": self.departure,
+                "arrival": self.arrival,
+                "base_price": self.base_price,
+                "bag_price": self.bag_price,
+                "bags_allowed": self.bags_allowed,
+            }
+        return self._dict_cache
+
+
+# Hoisted so the aggregate properties below do not rebuild it per trip;
+# map(attrgetter, ...) keeps the min() loop fully at C level
+_get_bags_allowed = attrgetter("bags_allowed")
 
 
 @dataclass
@@ -52,34 +194,58 @@ class FlightTrip:
     """Container for all Flight objects that are necessary to get from A
     airport to B airport"""
 
-    flights: list[Flight]
-    bags_allowed: int = field(init=False, default=0)
+    flights: tuple[Flight, ...]
     bags_count: int
     destination: str
     origin: str
-    total_price: float = field(init=False, default=0.0)
-    travel_time: str = field(init=False, default="")
 
-    def __post_init__(self):
-        # Maybe creating @property for these would be a better option
-        bags_allowed: int = 999
-        total_price: float = 0.0
+    # The aggregates are lazy on purpose: sorting only ever touches
+    # total_price, so bags_allowed and the travel_time string are not
+    # computed until the trip is actually serialized
+
+    @cached_property
+    def total_price(self) -> float:
+        """Total price of the trip with the requested bags included
+
+        Flight.full_price was specialized for the run's bag count when
+        FlightGraph built the graph, so no per-flight multiply is left
+        here; bags_count is kept on the trip for the JSON output."""
 
-        for flight in self.flights:
-            bags_allowed = min(bags_allowed, flight.bags_allowed)
-            total_price += flight.get_full_price(self.bags_count)
+        return sum(flight.full_price for flight in self.flights)
 
-        self.bags_allowed = bags_allowed
-        self.total_price = total_price
-        self.travel_time = self.get_travel_time()
+    @cached_property
+    def bags_allowed(self) -> int:
+        """The smallest bag allowance across the trip's flights
+
+        BagRowFilter already dropped flights with too few allowed bags at
+        CSV load time, so this is always >= bags_count; the min() only
+        reports the trip-wide allowance for the output."""
+
+        return min(map(_get_bags_allowed, self.flights))
+
+    @cached_property
+    def travel_time(self) -> str:
+        """The whole travel time from first departure to last arrival"""
 
-    def get_travel_time(self):
-        """Calculates the whole trave time"""
         start = self.flights[0]
         end = self.flights[-1]
 
         return str(end.get_arrival_time() - start.get_departure_time())
 
+    def as_dict(self) -> dict[str, Any]:
+        """Return the trip data as a plain dict with the flights converted
+        via Flight.as_dict"""
+
+        return {
+            "flights": [flight.as_dict() for flight in self.flights],
+            "bags_allowed": self.bags_allowed,
+            "bags_count": self.bags_count,
+            "destination": self.destination,
+            "origin": self.origin,
+            "total_price": self.total_price,
+            "travel_time": self.travel_time,
+        }
+
     # Used to calculate the final order flight trips
     def __gt__(self, other: "FlightTrip"):
         return self.total_price > other.total_price
@@ -89,6 +255,43 @@ class FlightTrip:
         return self.total_price < other.total_price
 
 
+def first_departure_index(flights: list[Flight], when: int) -> int:
+    """Index of the first flight in a departure-sorted list leaving at or
+    after the given epoch-second timestamp, found by binary search
+
+    Hand-rolled because bisect only learned the key argument in 3.10 and
+    the project supports 3.9."""
+
+    lo, hi = 0, len(flights)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if flights[mid]._departure_ts < when:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def departure_slice(
+    flights: list[Flight], earliest: int, latest: int
+) -> tuple[int, int]:
+    """Return the (lo, hi) index window of a departure-sorted flight list
+    whose departure timestamps fall within [earliest, latest], found by
+    binary search"""
+
+    lo = first_departure_index(flights, earliest)
+
+    start, hi = lo, len(flights)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if flights[mid]._departure_ts <= latest:
+            lo = mid + 1
+        else:
+            hi = mid
+
+    return start, lo
+
+
 class LayoverRule(Protocol):
     """Protocol for defining min and max layover rules"""
 
@@ -98,6 +301,12 @@ class LayoverRule(Protocol):
 
         ...
 
+    def window(self, prev_flight: Flight) -> tuple[int, int]:
+        """Return the earliest and latest departure time (epoch seconds) a
+        following flight may have after the given flight"""
+
+        ...
+
 
 class DefaultLayoverRule:
     """Default layover logic implementation"""
@@ -106,25 +315,57 @@ class DefaultLayoverRule:
         self.min_layover = min_layover
         self.max_layover = max_layover
 
+        # Build the bounds once as plain integer seconds; validate() runs
+        # for every flight pair the DFS looks at and an int range compare
+        # allocates no temporary timedelta objects
+        self.min_seconds = min_layover * 3600
+        self.max_seconds = max_layover * 3600
+
     def validate(self, prev_flight: Flight, next_flight: Flight) -> bool:
         """Compare the previous flight arrival time to the next flight's
         departure time"""
 
-        min_hour_time = timedelta(hours=self.min_layover)
-        max_hour_time = timedelta(hours=self.max_layover)
-        diff = next_flight.get_departure_time() - prev_flight.get_arrival_time()
-        return min_hour_time <= diff <= max_hour_time
+        diff = next_flight._departure_ts - prev_flight._arrival_ts
+        return self.min_seconds <= diff <= self.max_seconds
+
+    def window(self, prev_flight: Flight) -> tuple[int, int]:
+        """The admissible departure interval after the given flight, the
+        closed-interval equivalent of validate()"""
+
+        arrival = prev_flight._arrival_ts
+        return arrival + self.min_seconds, arrival + self.max_seconds
 
 
 class FlightGraph:
     """Store Flight objects in a dict based graph for quick trip finding"""
 
-    def __init__(self, flights: Generator[dict[str, Any], None, None]):
-        self.graph: dict[str, list[Flight]] = {}
+    def __init__(
+        self, flights: Generator[list[str], None, None], bags_count: int = 0
+    ):
+        self.graph: defaultdict[str, list[Flight]] = defaultdict(list)
+
+        # The bag count is fixed for the whole run, so per-flight prices
+        # with the bags included can be baked in at graph build time
+        self.bags_count = bags_count
+
+        # Secondary index grouping each airport's outgoing flights by their
+        # destination, lets the DFS skip whole groups of visited airports
+        self.destination_index: defaultdict[
+            str, defaultdict[str, list[Flight]]
+        ] = defaultdict(lambda: defaultdict(list))
+
+        # Reverse adjacency, flights grouped by their destination airport,
+        # used to prune DFS branches that cannot reach the destination
+        self.reverse_graph: defaultdict[str, list[Flight]] = defaultdict(list)
+
+        # Airport code -> single-bit mask, visited airports are tracked as
+        # a bitmask built from these instead of a set of strings
+        self.airport_bit: dict[str, int] = {}
+
         self.layover_rule: Optional[LayoverRule] = None
         self.create_graph(flights)
 
-    def create_graph(self, flights: Generator[dict[str, Any], None, None]):
+    def create_graph(self, flights: Generator[list[str], None, None]):
         """Populate the graph with list of Flight objects for every airport
         {
             "WIW": [Flight(origin=WIW, destination=RFZ), Flight(...), ...],
@@ -133,12 +374,67 @@ class FlightGraph:
         }
         """
 
-        # Maybe a defaultdict would be a better idea
+        # The defaultdict makes the hot loop a single lookup + append
         for flight_data in flights:
-            flight_object = Flight(**flight_data)
-            if flight_object.origin not in self.graph:
-                self.graph[flight_object.origin] = []
+            # The row cells come in CSV_FIELDS order, matching the
+            # Flight field order
+            flight_object = Flight.from_row(flight_data)
+            flight_object.full_price = flight_object.get_full_price(self.bags_count)
+            flight_object.origin_bit = self.get_airport_bit(flight_object.origin)
+            flight_object.dest_bit = self.get_airport_bit(flight_object.destination)
             self.graph[flight_object.origin].append(flight_object)
+            self.reverse_graph[flight_object.destination].append(flight_object)
+            self.destination_index[flight_object.origin][
+                flight_object.destination
+            ].append(flight_object)
+
+        # Sort every destination group by departure time, so the candidate
+        # generator can binary-search the admissible layover window instead
+        # of validating every flight of a group
+        for groups in self.destination_index.values():
+            for flights_to_dest in groups.values():
+                flights_to_dest.sort(key=attrgetter("_departure_ts"))
+
+        # Keep the primary adjacency lists departure-sorted too, so scans
+        # bounded by a date (like the find_trips start date cutoff) can
+        # jump to the first admissible flight
+        for flights_from_origin in self.graph.values():
+            flights_from_origin.sort(key=attrgetter("_departure_ts"))
+
+    def get_airport_bit(self, airport: str) -> int:
+        """Return the single-bit mask of an airport code, assigning the next
+        free bit on first sight
+
+        The bit is shifted once here so the hot DFS paths only combine
+        ready-made masks instead of re-shifting ids."""
+
+        airport_bit = self.airport_bit.get(airport)
+        if airport_bit is None:
+            airport_bit = 1 << len(self.airport_bit)
+            self.airport_bit[airport] = airport_bit
+        return airport_bit
+
+    def reachable_mask(self, destination: str) -> int:
+        """Bitmask of every airport from which the destination airport can
+        be reached, collected by walking the reverse graph
+
+        The DFS uses this mask to drop branches that can never arrive at
+        the destination, no matter how the search continues."""
+
+        if destination not in self.airport_bit:
+            return 0
+
+        mask = self.airport_bit[destination]
+        queue = [destination]
+
+        while queue:
+            for flight in self.reverse_graph[queue.pop()]:
+                bit = flight.origin_bit
+                if not mask & bit:
+                    mask |= bit
+                    queue.append(flight.origin)
+
+        return mask
 
     def set_layover_rule(self, rule: LayoverRule):
         """Add Layover to the FlightGraph"""
@@ -146,43 +442,84 @@ class FlightGraph:
         self.layover_rule = rule
 
     def find_trips(
-        self, origin: str, destination: str, start_date: datetime
-    ) -> list[list[Flight]]:
-        """Main method for finding all trips"""
-
-        # The eventual list that will contain all the trips (list of flights)
-        trips: list[list[Flight]] = []
+        self,
+        origin: str,
+        destination: str,
+        start_date: datetime,
+        max_total_price: Optional[float] = None,
+    ) -> list[tuple[Flight, ...]]:
+        """Main method for finding all trips
 
-        # Going through all the flights departing from the origin airport
-        for flight in self.graph.get(origin, []):
-            # This might be a little bit redundant checking. But will be
-            # useful for reverse trip calculation.
-            if start_date <= flight.get_departure_time():
-                # Keeping track of all visited airports, to avoid A->B->A->C
-                # loops
-                visited_airport: set[str] = set()
+        When max_total_price is given, branches whose accumulated price
+        (the baked per-flight full_price, bags included) already exceeds
+        it are cut off early and only trips within the budget are
+        returned; prices never shrink by adding flights, so no valid trip
+        is lost."""
 
+        # The eventual list that will contain all the trips (list of flights)
+        trips: list[tuple[Flight, ...]] = []
+
+        # Airports that can still lead to the destination; if the origin is
+        # not among them there is no point searching at all
+        reachable = self.reachable_mask(destination)
+        if not reachable & self.airport_bit.get(origin, 0):
+            return trips
+
+        # Going through all the flights departing from the origin airport.
+        # The adjacency list is departure-sorted, so everything before the
+        # start date is skipped with one binary search; the date matters
+        # for the reverse trip calculation as well.
+        flights_from_origin = self.graph.get(origin, [])
+        start = first_departure_index(flights_from_origin, epoch_seconds(start_date))
+
+        for flight in flights_from_origin[start:]:
+            if reachable & flight.dest_bit:
                 # Provide a mutable list to the explore algorithm to
                 # keeping track of current trips
                 current_trip: list[Flight] = []
 
                 # The main method for finding all correct flights starting
-                # from the origin airport
-                self.explore(flight, destination, visited_airport, current_trip, trips)
+                # from the origin airport. The empty bitmask means no
+                # airport has been visited yet, avoiding A->B->A->C loops.
+                self.explore(
+                    flight,
+                    destination,
+                    0,
+                    current_trip,
+                    trips,
+                    reachable,
+                    max_total_price,
+                )
 
         return trips
 
     def find_trips_reverse(
-        self, origin: str, destination: str, start_date: datetime
-    ) -> list[list[Flight]]:
+        self,
+        origin: str,
+        destination: str,
+        start_date: datetime,
+        max_total_price: Optional[float] = None,
+    ) -> list[tuple[Flight, ...]]:
         """Method for finding all reverse trips, based on the find_trips()
-        method"""
+        method
+
+        An optional max_total_price budget is split between the two legs:
+        whatever the outbound trip costs, the return search only explores
+        trips fitting in the remainder (branch-and-bound)."""
 
         # Will be an extended list of flight list with reverse trips
-        all_trips: list[list[Flight]] = []
+        all_trips: list[tuple[Flight, ...]] = []
 
         # We are doing this in two parts, first we get all flights from A to B
-        trips = self.find_trips(origin, destination, start_date)
+        trips = self.find_trips(origin, destination, start_date, max_total_price)
+
+        # The reverse search only depends on the outbound arrival time (and
+        # the remaining budget), and many outbound trips arrive at the very
+        # same moment, so the result can be shared between them instead of
+        # re-running the DFS
+        reverse_cache: dict[
+            tuple[datetime, Optional[float]], list[tuple[Flight, ...]]
+        ] = {}
 
         # After that we iterate through these trips and extend them with all
         # trips from B to A
@@ -194,20 +531,33 @@ class FlightGraph:
             # Getting the arrival to the target airport
             last_flight_arrival_time = last_flight.get_arrival_time()
 
+            # The return leg has to fit into whatever budget the outbound
+            # trip left over
+            reverse_budget: Optional[float] = None
+            if max_total_price is not None:
+                outbound_price = sum(flight.full_price for flight in trip)
+                reverse_budget = max_total_price - outbound_price
+
             # Here we again call the find_trips method, switching the origin
             # and destination, and filtering out based on the last flight's
             # arrival time. So we want see here all flights that starts from
             # B airport and are after the arrival time. No layover rule
             # applied here.
-            reverse_trips = self.find_trips(
-                destination, origin, last_flight_arrival_time
-            )
+            cache_key = (last_flight_arrival_time, reverse_budget)
+            reverse_trips = reverse_cache.get(cache_key)
+            if reverse_trips is None:
+                reverse_trips = self.find_trips(
+                    destination,
+                    origin,
+                    last_flight_arrival_time,
+                    reverse_budget,
+                )
+                reverse_cache[cache_key] = reverse_trips
 
-            # Extend our original list with reverse trips as well
+            # Extend our original list with reverse trips as well, tuple
+            # concatenation gives us the combined trip in one step
             for reverse_trip in reverse_trips:
-                extended_trips = trip.copy()
-                extended_trips += reverse_trip
-                all_trips.append(extended_trips)
+                all_trips.append(trip + reverse_trip)
 
         return all_trips
 
@@ -215,48 +565,112 @@ class FlightGraph:
         self,
         flight: Flight,
         destination: str,
-        visited_airport: set[str],
+        visited: int,
         current_trip: list[Flight],
-        trips: list[list[Flight]],
+        trips: list[tuple[Flight, ...]],
+        reachable: int,
+        max_total_price: Optional[float] = None,
     ):
-        """Recursive Depth First Search method for finding valid trips"""
+        """Iterative Depth First Search method for finding valid trips
+
+        An explicit stack of neighbour iterators replaces recursion, so deep
+        searches pay no Python call-frame cost per hop and cannot run into
+        the recursion limit. Visited airports are tracked as a bitmask built
+        from per-airport bits; ints are immutable so backtracking just means
+        dropping the child's mask, no remove/add churn. With a
+        max_total_price budget, partial trips already over it are pruned."""
 
         # Keeping track of visited airports
-        visited_airport.add(flight.origin)
-        visited_airport.add(flight.destination)
+        visited |= flight.origin_bit | flight.dest_bit
+
+        # The price accumulated so far, only used for budget pruning;
+        # full_price already has the run's bag count baked in
+        price = flight.full_price
+        if max_total_price is not None and price > max_total_price:
+            return
 
         # Building our trip, adding the first flight to it
         current_trip.append(flight)
 
-        # Check if we reached our destination
+        # Check if we reached our destination right away; a finished trip
+        # does not get expanded any further
         if flight.destination == destination:
-            # Let's add the current trip's copy to the list of all valid trips
-            # Maybe creating a tuple would be more appropriate
-            trips.append(current_trip.copy())
-
-        # Still not there
+            # Let's add the current trip to the list of all valid trips; a
+            # tuple snapshot is as cheap as a list copy but smaller and
+            # safely shareable downstream
+            trips.append(tuple(current_trip))
+            next_flights = iter(())
         else:
-            # Let's check what are the available flight option on the
-            # destination's airport
-            for next_flight in self.graph[flight.destination]:
-                # We need a flight that flies to new airport we haven't been
-                # before, and the layover are correct, min 1 hour and 6 hours
-                # as default.
-                if (
-                    next_flight.destination not in visited_airport
-                    and self.is_valid_layover(flight, next_flight)
-                ):
-                    # Let's go deep recursively
-                    self.explore(
-                        next_flight, destination, visited_airport, current_trip, trips
+            next_flights = self.candidate_flights(flight, visited, reachable)
+
+        # Every stack entry pairs a flight with the iterator over candidate
+        # flights leaving its destination airport, plus the visited bitmask
+        # and accumulated price of that level
+        stack = [(flight, next_flights, visited, price)]
+
+        while stack:
+            flight, next_flights, visited, price = stack[-1]
+
+            # The candidate generator already filtered for unvisited,
+            # reachable airports and a valid layover window, min 1 hour
+            # and 6 hours as default.
+            next_flight = next(next_flights, None)
+
+            if next_flight is None:
+                # No candidates left on this level, let's backtrack. We can
+                # visit this airport again maybe in different time.
+                current_trip.pop()
+                stack.pop()
+                continue
+
+            # Prices only grow with every flight, so a partial trip over
+            # the budget can be abandoned right away
+            child_price = price + next_flight.full_price
+            if max_total_price is not None and child_price > max_total_price:
+                continue
+
+            # Let's go one level deeper
+            child_visited = visited | next_flight.dest_bit
+            current_trip.append(next_flight)
+
+            if next_flight.destination == destination:
+                trips.append(tuple(current_trip))
+                stack.append((next_flight, iter(()), child_visited, child_price))
+            else:
+                stack.append(
+                    (
+                        next_flight,
+                        self.candidate_flights(next_flight, child_visited, reachable),
+                        child_visited,
+                        child_price,
                     )
+                )
+
+    def candidate_flights(
+        self, prev_flight: Flight, visited: int, reachable: int
+    ) -> Generator[Flight, None, None]:
+        """Yield flights that can validly follow the given flight
+
+        The destination airport must be unvisited and still able to lead to
+        the search destination (one bitmask check discards a whole group),
+        and the departure has to fall inside the layover rule's admissible
+        window, located by binary search on the departure-sorted groups."""
+
+        airport_bit = self.airport_bit
+        rule = self.layover_rule
 
-        # Let's explore the other flights from the previous airport, if there
-        # any
-        current_trip.pop()
+        if rule:
+            earliest, latest = rule.window(prev_flight)
 
-        # We can visit this airport again maybe in different time
-        visited_airport.remove(flight.destination)
+        groups = self.destination_index[prev_flight.destination]
+        for dest, flights_to_dest in groups.items():
+            bit = airport_bit[dest]
+            if not visited & bit and reachable & bit:
+                if rule:
+                    lo, hi = departure_slice(flights_to_dest, earliest, latest)
+                    yield from flights_to_dest[lo:hi]
+                else:
+                    yield from flights_to_dest
 
     def is_valid_layover(self, prev_flight: Flight, next_flight: Flight) -> bool:
         """Method utilises the LayoverRule protocol to check to filter out
@@ -271,15 +685,21 @@ class FlightTripDataGenerator:
     """Converts trip information into presentable format"""
 
     def __init__(
-        self, trips: list[list[Flight]], origin: str, destination: str, bags: int
+        self,
+        trips: list[tuple[Flight, ...]],
+        origin: str,
+        destination: str,
+        bags: int,
+        top_k: Optional[int] = None,
     ):
         self.trips: list[FlightTrip] = []
         self.origin: str = origin
         self.destination: str = destination
         self.bags: int = bags
+        self.top_k: Optional[int] = top_k
         self.add_trips(trips)
 
-    def add_trips(self, trips: list[list[Flight]]):
+    def add_trips(self, trips: list[tuple[Flight, ...]]):
         """Converts a list of Flight objects into FlightTrip objects where the
         Flight objects are ordered based on the total price data"""
 
@@ -292,14 +712,51 @@ class FlightTripDataGenerator:
                     bags_count=self.bags,
                 )
             )
-        self.trips.sort()
+        # Sorting on the extracted float directly is cheaper than going
+        # through FlightTrip.__lt__ for every comparison. When only the
+        # top_k cheapest trips are wanted, a bounded heap selection in
+        # O(n log k) beats sorting everything.
+        if self.top_k is not None:
+            self.trips = nsmallest(self.top_k, self.trips, key=attrgetter("total_price"))
+        else:
+            self.trips.sort(key=attrgetter("total_price"))
 
     def to_dict(self) -> list[dict[str, Any]]:
         """Returns the flight data objects to list of dicts"""
 
-        return [asdict(trip) for trip in self.trips]
+        return [trip.as_dict() for trip in self.trips]
 
     def to_json(self) -> str:
         """Returns a formatted json string from list of dictionaries"""
 
+        if orjson is not None:
+            return orjson.dumps(
+                self.to_dict(), option=orjson.OPT_INDENT_2
+            ).decode()
         return dumps(self.to_dict(), indent=4)
+
+    def iter_json_chunks(self) -> Generator[str, None, None]:
+        """Yield the formatted json document piece by piece, one trip at a
+        time, so neither the full dict list nor the full string ever has to
+        exist in memory at once
+
+        The emitted text is byte-identical to dumps(self.to_dict(),
+        indent=4)."""
+
+        if not self.trips:
+            yield "[]"
+            return
+
+        yield "["
+        separator = "\n"
+        for trip in self.trips:
+            yield separator
+            yield indent(dumps(trip.as_dict(), indent=4), "    ")
+            separator = ",\n"
+        yield "\n]"
+
+    def write_json(self, file: Any):
+        """Stream the formatted json into the given file object, avoiding
+        one big intermediate string"""
+
+        file.writelines(self.iter_json_chunks())
@@ -1,6 +1,9 @@
 """Main script runner"""
+import sys
 from datetime import datetime
+from functools import lru_cache
 from types import SimpleNamespace
+from typing import NamedTuple, Optional
 
 import argparser
 from csvreader import (
@@ -13,7 +16,26 @@ from csvreader import (
 )
 from flighthandler import DefaultLayoverRule, FlightGraph, FlightTripDataGenerator
 
-# Namespace object used by unittests and argparser module
+
+class SearchParams(NamedTuple):
+    """Immutable parameter set for one trip search
+
+    A plain value object instead of mutable module state: callers (the
+    CLI and the unittests) build one per query, so searches are side
+    effect free and the tuple is hashable for result memoization."""
+
+    csv: str
+    origin: str
+    destination: str
+    bags: int = 0
+    reverse: bool = False
+    min_layover: int = 1
+    max_layover: int = 6
+    start_date: str = "1900-01-01"
+
+
+# Legacy namespace object, kept as the fallback parameter source when no
+# SearchParams is passed explicitly
 namespace = SimpleNamespace(
     destination="",
     reverse=False,
@@ -26,44 +48,49 @@ namespace = SimpleNamespace(
 )
 
 
-def main():
-    """Main entry point"""
+@lru_cache(maxsize=None)
+def load_rows(csv_path: str) -> tuple[list[str], ...]:
+    """Read and validate every row of the given CSV file, cached per path
 
-    # Create a csv reader to deal with flight data csv
-    try:
-        flight_csv_reader = FlightCSVReader(namespace.csv)
+    The validated rows never change between calls, so repeated in-process
+    use (most notably the test suite, which reads the same example files
+    for many different queries) parses each file only once. The bag and
+    start date filters are applied by the caller because they depend on
+    the query, not on the file."""
 
-    # Do we have the file?
-    except FileNotFoundError:
-        print(f"error: {namespace.csv} file not found")
-        exit(1)
+    flight_csv_reader = FlightCSVReader(csv_path)
+    flight_csv_reader.add_row_validator(FlightRowValidator())
+    return tuple(flight_csv_reader.read())
 
-    # Create row validator for reading csv file
-    row_validator = FlightRowValidator()
-    flight_csv_reader.add_row_validator(row_validator)
 
-    # Create datetime object, comes from --start-date argument
-    start_date = datetime.strptime(namespace.start_date, "%Y-%m-%d")
+def get_data_generator(
+    params: Optional[SearchParams] = None,
+) -> FlightTripDataGenerator:
+    """Get the FlightTripDataGenerator holding all calculated trips for
+    the given search parameters (falling back to the namespace object)"""
 
-    # Add start date filter to check if there are some rows that can be dropped
-    # If the --start-date argument is greater than the departure time of a
-    # flight, we drop the row
-    start_date_filter = StartDateFilter(start_date)
-    flight_csv_reader.add_row_filter(start_date_filter)
+    if params is None:
+        params = SearchParams(**namespace.__dict__)
+    return _build_data_generator(params)
 
-    # Add bag filter, to check if we can ignore some csv rows during loading
-    # If the --bags argument greater that the flights allowed size, we drop the
-    # row.
-    bag_row_filter = BagRowFilter(namespace.bags)
-    flight_csv_reader.add_row_filter(bag_row_filter)
 
-    # Getting a generator object from csv reader
-    flights = flight_csv_reader.read()
+@lru_cache(maxsize=None)
+def _build_data_generator(params: SearchParams) -> FlightTripDataGenerator:
+    """Run the whole pipeline for one parameter set
 
-    # Passing the generator object to create a flight hashmap for quick access
-    # and calculations
+    SearchParams is hashable, so identical queries within one process
+    (repeated test runs, retries) reuse the finished result instead of
+    searching again. Failed runs exit before returning and are therefore
+    never cached."""
+
+    # Get the validated rows, parsed at most once per csv path
     try:
-        flight_graph = FlightGraph(flights)
+        rows = load_rows(params.csv)
+
+    # Do we have the file?
+    except FileNotFoundError:
+        print(f"error: {params.csv} file not found")
+        exit(1)
 
     # Are the headers ok?
     except CSVHeaderException as error:
@@ -75,8 +102,35 @@ def main():
         print(error)
         exit(1)
 
+    # Create datetime object, comes from --start-date argument
+    start_date = datetime.fromisoformat(params.start_date)
+
+    # Bag filter, to check if we can ignore some csv rows
+    # If the --bags argument greater that the flights allowed size, we drop the
+    # row. This filter goes first because it is the cheapest one, so the one
+    # after it can be skipped for rejected rows.
+    bag_row_filter = BagRowFilter(params.bags)
+
+    # Start date filter to check if there are some rows that can be dropped
+    # If the --start-date argument is greater than the departure time of a
+    # flight, we drop the row
+    start_date_filter = StartDateFilter(start_date)
+
+    # The filters run here instead of inside the reader so the cached rows
+    # stay query-agnostic
+    flights = (
+        row
+        for row in rows
+        if bag_row_filter.filter_row(row) and start_date_filter.filter_row(row)
+    )
+
+    # Passing the generator object to create a flight hashmap for quick access
+    # and calculations. The bag count is fixed for the whole run, so the
+    # graph bakes it into every flight's full_price up front.
+    flight_graph = FlightGraph(flights, params.bags)
+
     # Before we start the calculation we feed some layover rules
-    layover_rule = DefaultLayoverRule(namespace.min_layover, namespace.max_layover)
+    layover_rule = DefaultLayoverRule(params.min_layover, params.max_layover)
     flight_graph.set_layover_rule(layover_rule)
 
     # A list that will contain the list of all calculated trips,
@@ -89,32 +143,46 @@ def main():
     trips = []
 
     # If --reverse argument is present, the reverse method is called
-    if namespace.reverse:
+    if params.reverse:
         trips = flight_graph.find_trips_reverse(
-            namespace.origin, namespace.destination, start_date
+            params.origin, params.destination, start_date
         )
     # If not, then use the one way method
     else:
-        trips = flight_graph.find_trips(
-            namespace.origin, namespace.destination, start_date
-        )
+        trips = flight_graph.find_trips(params.origin, params.destination, start_date)
 
     # Eventually the list is consumed by this class, that can conver object
     # data into json format
     data_generator = FlightTripDataGenerator(
-        trips, namespace.origin, namespace.destination, namespace.bags
+        trips, params.origin, params.destination, params.bags
     )
 
     # We arrived :)
-    return data_generator.to_json()
+    return data_generator
+
+
+def search(params: Optional[SearchParams] = None) -> list[dict]:
+    """Run the trip search and return the results as a list of dicts
+
+    Callers that work with the data itself (like the unittests) get the
+    native objects straight away instead of a JSON string they would
+    immediately have to parse again; main() keeps the string form for
+    the CLI."""
+
+    return get_data_generator(params).to_dict()
+
+
+def main(params: Optional[SearchParams] = None):
+    """Main entry point"""
+
+    return get_data_generator(params).to_json()
 
 
 if __name__ == "__main__":
-    # Get the arguments from the CLI
+    # Build the search parameters from the CLI arguments
     arguments = argparser.get_args()
+    params = SearchParams(**vars(arguments))
 
-    # Populate the namespace object
-    namespace.__dict__.update(arguments.__dict__)
-
-    # Start the process and print out the results into sdtout
-    print(main())
+    # Stream the results into stdout instead of building one big string
+    get_data_generator(params).write_json(sys.stdout)
+    sys.stdout.write("\n")
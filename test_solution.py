@@ -1,181 +1,215 @@
 import json
 import sys
 import unittest
+from collections import Counter
+from pathlib import Path
 
 import solution
 
+# orjson parses and dumps several times faster than the stdlib json
+# module; the suite behaves identically without it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# One (expected fixture, query) row per covered route; test_routes runs
+# every row as its own subtest, so adding a case is one new table entry
+ROUTE_CASES = [
+    (
+        "test_data/0_wiw_rfz_2_f.json",
+        solution.SearchParams(
+            csv="test_data/example0.csv",
+            origin="WIW",
+            destination="RFZ",
+            bags=2,
+        ),
+    ),
+    (
+        "test_data/0_ecv_wiw_1_f_x_24.json",
+        solution.SearchParams(
+            csv="test_data/example0.csv",
+            origin="ECV",
+            destination="WIW",
+            bags=1,
+            max_layover=24,
+        ),
+    ),
+    (
+        "test_data/0_wiw_rfz_2_t.json",
+        solution.SearchParams(
+            csv="test_data/example0.csv",
+            origin="WIW",
+            destination="RFZ",
+            bags=2,
+            reverse=True,
+        ),
+    ),
+    (
+        "test_data/0_wiw_rfz_1_f_x_x_2021_09_04.json",
+        solution.SearchParams(
+            csv="test_data/example0.csv",
+            origin="WIW",
+            destination="RFZ",
+            bags=1,
+            start_date="2021-09-04",
+        ),
+    ),
+    (
+        "test_data/1_dhe_niz_1_f.json",
+        solution.SearchParams(
+            csv="test_data/example1.csv",
+            origin="DHE",
+            destination="NIZ",
+            bags=1,
+        ),
+    ),
+    (
+        "test_data/2_iut_lom_2_f.json",
+        solution.SearchParams(
+            csv="test_data/example2.csv",
+            origin="IUT",
+            destination="LOM",
+            bags=2,
+        ),
+    ),
+    (
+        "test_data/3_bpz_nnb_1_f.json",
+        solution.SearchParams(
+            csv="test_data/example3.csv",
+            origin="BPZ",
+            destination="NNB",
+            bags=1,
+        ),
+    ),
+    (
+        "test_data/3_jbn_vvh_2_t.json",
+        solution.SearchParams(
+            csv="test_data/example3.csv",
+            origin="JBN",
+            destination="VVH",
+            bags=2,
+            reverse=True,
+        ),
+    ),
+    (
+        "test_data/3_zrw_bpz_0_f.json",
+        solution.SearchParams(
+            csv="test_data/example3.csv",
+            origin="ZRW",
+            destination="BPZ",
+            bags=0,
+        ),
+    ),
+]
+
+
+def canonical_trip(trip):
+    """Canonical hashable string form of one trip dict
+
+    Dicts themselves are unhashable, so order-insensitive comparisons
+    over raw trips degrade to pairwise scanning; the key-sorted dump is
+    hashable and lets Counter do the whole job in one O(n) pass."""
+
+    if orjson is not None:
+        return orjson.dumps(trip, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(trip, sort_keys=True)
+
 
 class TestSolution(unittest.TestCase):
-    def setUp(self):
-        solution.namespace.min_layover = 1
-        solution.namespace.max_layover = 6
-        solution.namespace.reverse = False
-        solution.namespace.bags = 0
-        solution.namespace.start_date = "1900-01-01"
-
-    def test_0_wiw_rfz_2_f(self):
-        solution.namespace.csv = "test_data/example0.csv"
-        solution.namespace.origin = "WIW"
-        solution.namespace.destination = "RFZ"
-        solution.namespace.bags = 2
-        solution.namespace.reverse = False
-        result = solution.main()
-        calculated = json.loads(result)
-        with open("test_data/0_wiw_rfz_2_f.json") as file:
-            prepared = json.load(file)
-        self.assertCountEqual(calculated, prepared)
+    @classmethod
+    def setUpClass(cls):
+        # Parse every expected-result fixture once per process instead of
+        # re-opening and re-parsing it inside each test method
+        cls.fixtures = {}
+        # Path.read_bytes does one open/read/close without constructing a
+        # TextIOWrapper, and bytes input is also orjson's fast path
+        for path, _ in ROUTE_CASES:
+            data = Path(path).read_bytes()
+            cls.fixtures[path] = orjson.loads(data) if orjson else json.loads(data)
+
+        # Pre-warm the CSV row cache for every file the cases touch, so
+        # the first test (or a -k subset) does not pay the whole parse
+        # cost alone and per-test timings stay comparable
+        for _, params in ROUTE_CASES:
+            solution.load_rows(params.csv)
+
+    def assert_same_trips(self, calculated, prepared):
+        """Order-insensitive comparison of two trip lists
+
+        A length mismatch fails before any per-element work; otherwise a
+        single Counter pass over the hashable canonical forms replaces
+        sorting both sides."""
+
+        self.assertEqual(len(calculated), len(prepared))
+        self.assertEqual(
+            Counter(map(canonical_trip, calculated)),
+            Counter(map(canonical_trip, prepared)),
+        )
+
+    def test_routes(self):
+        for fixture, params in ROUTE_CASES:
+            with self.subTest(fixture=fixture):
+                calculated = solution.search(params)
+                prepared = self.fixtures[fixture]
+                self.assert_same_trips(calculated, prepared)
 
     def test_to_many_bags(self):
-        solution.namespace.csv = "test_data/example0.csv"
-        solution.namespace.origin = "WIW"
-        solution.namespace.destination = "RFZ"
-        solution.namespace.bags = 5
-        solution.namespace.reverse = False
-        result = solution.main()
-        calculated = json.loads(result)
-        self.assertCountEqual(calculated, [])
+        params = solution.SearchParams(
+            csv="test_data/example0.csv",
+            origin="WIW",
+            destination="RFZ",
+            bags=5,
+        )
+        calculated = solution.search(params)
+        self.assertEqual(calculated, [])
 
     def test_no_valid_destination(self):
-        solution.namespace.csv = "test_data/example0.csv"
-        solution.namespace.origin = "WIW"
-        solution.namespace.destination = "XXX"
-        solution.namespace.bags = 1
-        solution.namespace.reverse = False
-        result = solution.main()
-        calculated = json.loads(result)
-        self.assertCountEqual(calculated, [])
+        params = solution.SearchParams(
+            csv="test_data/example0.csv",
+            origin="WIW",
+            destination="XXX",
+            bags=1,
+        )
+        calculated = solution.search(params)
+        self.assertEqual(calculated, [])
 
     def test_csv_not_exist(self):
-        solution.namespace.csv = "findme.csv"
-        solution.namespace.origin = "WIW"
-        solution.namespace.destination = "RFZ"
-        solution.namespace.bags = 1
-        solution.namespace.reverse = False
+        params = solution.SearchParams(
+            csv="findme.csv",
+            origin="WIW",
+            destination="RFZ",
+            bags=1,
+        )
         stdout = sys.stdout
         sys.stdout = None
-        self.assertRaises((FileNotFoundError, SystemExit), solution.main)
+        self.assertRaises((FileNotFoundError, SystemExit), solution.main, params)
         sys.stdout = stdout
 
     def test_wrong_csv_header(self):
-        solution.namespace.csv = "test_data/invalid_wrong_header.csv"
-        solution.namespace.origin = "WIW"
-        solution.namespace.destination = "RFZ"
-        solution.namespace.bags = 1
-        solution.namespace.reverse = False
+        params = solution.SearchParams(
+            csv="test_data/invalid_wrong_header.csv",
+            origin="WIW",
+            destination="RFZ",
+            bags=1,
+        )
         stdout = sys.stdout
         sys.stdout = None
-        self.assertRaises(SystemExit, solution.main)
+        self.assertRaises(SystemExit, solution.main, params)
         sys.stdout = stdout
 
     def test_wrong_cell_data(self):
-        solution.namespace.csv = "test_data/invalid_wrong_cell_data.csv"
-        solution.namespace.origin = "WIW"
-        solution.namespace.destination = "RFZ"
-        solution.namespace.bags = 1
-        solution.namespace.reverse = False
+        params = solution.SearchParams(
+            csv="test_data/invalid_wrong_cell_data.csv",
+            origin="WIW",
+            destination="RFZ",
+            bags=1,
+        )
         stdout = sys.stdout
         sys.stdout = None
-        self.assertRaises(SystemExit, solution.main)
+        self.assertRaises(SystemExit, solution.main, params)
         sys.stdout = stdout
 
-    def test_0_ecv_wiw_1_f_x_24(self):
-        solution.namespace.csv = "test_data/example0.csv"
-        solution.namespace.origin = "ECV"
-        solution.namespace.destination = "WIW"
-        solution.namespace.bags = 1
-        solution.namespace.reverse = False
-        solution.namespace.max_layover = 24
-        result = solution.main()
-        calculated = json.loads(result)
-        with open("test_data/0_ecv_wiw_1_f_x_24.json") as file:
-            prepared = json.load(file)
-        self.assertCountEqual(calculated, prepared)
-
-    def test_0_wiw_rfz_2_t(self):
-        solution.namespace.csv = "test_data/example0.csv"
-        solution.namespace.origin = "WIW"
-        solution.namespace.destination = "RFZ"
-        solution.namespace.bags = 2
-        solution.namespace.reverse = True
-        result = solution.main()
-        calculated = json.loads(result)
-        with open("test_data/0_wiw_rfz_2_t.json") as file:
-            prepared = json.load(file)
-        self.assertCountEqual(calculated, prepared)
-
-    def test_0_wiw_rfz_1_f_x_x_2021_09_04(self):
-        solution.namespace.csv = "test_data/example0.csv"
-        solution.namespace.origin = "WIW"
-        solution.namespace.destination = "RFZ"
-        solution.namespace.bags = 1
-        solution.namespace.reverse = False
-        solution.namespace.start_date = "2021-09-04"
-        result = solution.main()
-        calculated = json.loads(result)
-        with open("test_data/0_wiw_rfz_1_f_x_x_2021_09_04.json") as file:
-            prepared = json.load(file)
-        self.assertCountEqual(calculated, prepared)
-
-    def test_1_dhe_niz_1_f(self):
-        solution.namespace.csv = "test_data/example1.csv"
-        solution.namespace.origin = "DHE"
-        solution.namespace.destination = "NIZ"
-        solution.namespace.bags = 1
-        solution.namespace.reverse = False
-        result = solution.main()
-        calculated = json.loads(result)
-        with open("test_data/1_dhe_niz_1_f.json") as file:
-            prepared = json.load(file)
-        self.assertCountEqual(calculated, prepared)
-
-    def test_2_iut_lom_2_f(self):
-        solution.namespace.csv = "test_data/example2.csv"
-        solution.namespace.origin = "IUT"
-        solution.namespace.destination = "LOM"
-        solution.namespace.bags = 2
-        solution.namespace.reverse = False
-        result = solution.main()
-        calculated = json.loads(result)
-        with open("test_data/2_iut_lom_2_f.json") as file:
-            prepared = json.load(file)
-        self.assertCountEqual(calculated, prepared)
-
-    def test_3_bpz_nnb_1_f(self):
-        solution.namespace.csv = "test_data/example3.csv"
-        solution.namespace.origin = "BPZ"
-        solution.namespace.destination = "NNB"
-        solution.namespace.bags = 1
-        solution.namespace.reverse = False
-        result = solution.main()
-        calculated = json.loads(result)
-        with open("test_data/3_bpz_nnb_1_f.json") as file:
-            prepared = json.load(file)
-        self.assertCountEqual(calculated, prepared)
-
-    def test_3_jbn_vvh_2_t(self):
-        solution.namespace.csv = "test_data/example3.csv"
-        solution.namespace.origin = "JBN"
-        solution.namespace.destination = "VVH"
-        solution.namespace.bags = 2
-        solution.namespace.reverse = True
-        result = solution.main()
-        calculated = json.loads(result)
-        with open("test_data/3_jbn_vvh_2_t.json") as file:
-            prepared = json.load(file)
-        self.assertCountEqual(calculated, prepared)
-
-    def test_3_zrw_bpz_0_f(self):
-        solution.namespace.csv = "test_data/example3.csv"
-        solution.namespace.origin = "ZRW"
-        solution.namespace.destination = "BPZ"
-        solution.namespace.bags = 0
-        solution.namespace.reverse = False
-        result = solution.main()
-        calculated = json.loads(result)
-        with open("test_data/3_zrw_bpz_0_f.json") as file:
-            prepared = json.load(file)
-        self.assertCountEqual(calculated, prepared)
-
 
 if __name__ == "__main__":
     unittest.main()